@@ -1,10 +1,11 @@
 import streamlit as st
-import nltk
 import io
 import requests
 import json
+import time
 import re
 import PyPDF2
+from shared_engine import SharedEngine, cache_key
 
 # ---------------- PAGE CONFIG ----------------
 st.set_page_config(
@@ -29,16 +30,6 @@ header {visibility: hidden;}
 </style>
 """, unsafe_allow_html=True)
 
-# ---------------- NLTK ----------------
-@st.cache_resource
-def download_nltk_data():
-    try:
-        nltk.data.find("tokenizers/punkt")
-    except LookupError:
-        nltk.download("punkt", quiet=True)
-
-download_nltk_data()
-
 # ---------------- JOB DESCRIPTIONS ----------------
 PREDEFINED_JOB_DESCRIPTIONS = {
     "Cloud / DevOps Intern (AWS Focused)": """
@@ -87,6 +78,15 @@ Skills: React, Node.js, Python, REST APIs
     "Custom Job Description": ""
 }
 
+# ---------------- SHARED ENGINE ----------------
+# The Gemini response cache is shared by every session, and identical in-flight
+# analyses are sent to Gemini only once
+@st.cache_resource
+def load_shared_engine():
+    return SharedEngine()
+
+load_shared_engine()
+
 # ---------------- GOOGLE DRIVE HELPERS ----------------
 def extract_file_id_from_gdrive_url(url):
     patterns = [
@@ -150,6 +150,11 @@ def extract_text_from_pdf(uploaded_file):
         return None
 
 # ---------------- GEMINI API ----------------
+class GeminiAnalysisError(Exception):
+    """A Gemini call failed with a message that can be shown to the user."""
+
+# Runs coalesced through the shared engine, so it must report failures by
+# raising instead of calling st.*: only one waiting session would see them
 def get_gemini_analysis(resume_text, jd_text):
     api_key = st.secrets["GEMINI_API_KEY"]
     api_url = (
@@ -211,10 +216,9 @@ Job Description:
                     delay *= 2
                     continue
                 else:
-                    st.warning(
+                    raise GeminiAnalysisError(
                         "🚦 High traffic right now. Please wait 1–2 minutes and try again."
                     )
-                    return None
 
             response.raise_for_status()
 
@@ -230,16 +234,12 @@ Job Description:
             return json.loads(cleaned_text)
 
         except json.JSONDecodeError:
-            st.error("⚠️ AI response was malformed. Please retry once.")
-            return None
+            raise GeminiAnalysisError("⚠️ AI response was malformed. Please retry once.")
 
         except requests.exceptions.RequestException:
-            st.warning(
+            raise GeminiAnalysisError(
                 "⚠️ Temporary AI service issue. Please retry in a moment."
             )
-            return None
-
-    return None
 
 # ---------------- UI ----------------
 st.markdown('<h1 class="main-title">ATS Resume Compatibility Checker</h1>', unsafe_allow_html=True)
@@ -285,7 +285,14 @@ if st.button("Analyze Compatibility", type="primary", use_container_width=True):
         st.warning("Please provide a job description.")
     else:
         with st.spinner("Analyzing resume with Gemini..."):
-            result = get_gemini_analysis(resume_text, job_description)
+            try:
+                result = load_shared_engine().run(
+                    "llm", cache_key(resume_text, job_description),
+                    get_gemini_analysis, resume_text, job_description
+                )
+            except GeminiAnalysisError as e:
+                st.warning(str(e))
+                result = None
 
             if result:
                 st.metric(
@@ -5,15 +5,15 @@ st.set_page_config(page_title="ATS Resume Checker", page_icon="���", layou
 
 import PyPDF2
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from nltk.tokenize import word_tokenize
 import io
+import hashlib
 import requests
 import re
 from urllib.parse import urlparse, parse_qs
+from sections import score_resume_sections
+from semantic import EMBEDDINGS_AVAILABLE, StoredResumeIndex, explain_tfidf_scores, get_scoring_backend
+from resume_store import ResumeStore
+from shared_engine import SharedEngine, cache_key
 
 # OCR imports
 try:
@@ -25,14 +25,26 @@ except ImportError:
     OCR_AVAILABLE = False
 
 @st.cache_resource
-def downloadNltkData():
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-    nltk.download('wordnet', quiet=True)
-    nltk.download('punkt_tab', quiet=True)
-    nltk.download('omw-1.4', quiet=True)
-    
-downloadNltkData()
+def loadEmbeddingBackend():
+    return get_scoring_backend("embedding")
+
+RESUME_STORE_DIR = "resume_store"
+# Drive file id -> content key of the text it last resolved to, kept apart so
+# the links never show up as resumes of their own
+DRIVE_LINKS_DIR = "resume_store_links"
+
+@st.cache_resource
+def loadResumeStore():
+    return ResumeStore(RESUME_STORE_DIR)
+
+@st.cache_resource
+def loadDriveLinks():
+    return ResumeStore(DRIVE_LINKS_DIR)
+
+# One index for every session, updated in place as resumes are stored
+@st.cache_resource
+def loadStoredResumeIndex():
+    return StoredResumeIndex()
 
 # Predefined Job Descriptions
 PREDEFINED_JOB_DESCRIPTIONS = {
@@ -96,6 +108,14 @@ Preferred: Experience with B2B SaaS, technical background, MBA.""",
     "Custom Job Description": ""
 }
 
+# One engine per process: NLTK resources, preprocessed JDs and caches are shared
+# by every session, and identical in-flight requests are computed once
+@st.cache_resource
+def loadSharedEngine():
+    return SharedEngine(PREDEFINED_JOB_DESCRIPTIONS)
+
+loadSharedEngine()
+
 def extract_file_id_from_gdrive_url(url):
     """Extract file ID from Google Drive URL"""
     patterns = [
@@ -161,22 +181,26 @@ def download_file_from_gdrive(file_id):
         st.error(f"Error downloading from Google Drive: {e}")
         return None
 
+def ocr_pdf_content(pdf_content):
+    """Runs OCR over every page of a PDF. Called on the shared worker pool."""
+    # Convert PDF to images
+    images = convert_from_bytes(pdf_content, dpi=300)
+    
+    extracted_text = ""
+    for i, image in enumerate(images):
+        # Use OCR to extract text from each page
+        page_text = pytesseract.image_to_string(image, lang='eng')
+        extracted_text += page_text + "\n"
+        
+    return extracted_text.strip()
+
 def extract_text_with_ocr(pdf_content):
     """Extract text from PDF using OCR (for scanned documents)"""
     if not OCR_AVAILABLE:
         return None
     
     try:
-        # Convert PDF to images
-        images = convert_from_bytes(pdf_content, dpi=300)
-        
-        extracted_text = ""
-        for i, image in enumerate(images):
-            # Use OCR to extract text from each page
-            page_text = pytesseract.image_to_string(image, lang='eng')
-            extracted_text += page_text + "\n"
-            
-        return extracted_text.strip()
+        return loadSharedEngine().run("ocr", cache_key(pdf_content), ocr_pdf_content, pdf_content, offload=True)
     except Exception as e:
         st.error(f"OCR processing failed: {e}")
         return None
@@ -185,32 +209,28 @@ def preprocessText(text):
     """Cleans and preprocesses the input text."""
     if not text:
         return ""
-    tokens = word_tokenize(text.lower())
-    tokens = [word for word in tokens if word.isalpha()]
-    
-    stop_words = set(stopwords.words('english'))
-    tokens = [word for word in tokens if word not in stop_words]
-    
-    lemmatizer = WordNetLemmatizer()
-    tokens = [lemmatizer.lemmatize(word) for word in tokens]
-    
-    return " ".join(tokens)
+    engine = loadSharedEngine()
+    return engine.run("preprocess", cache_key(text), engine.preprocess, text)
+
+def read_pdf_text(pdf_content):
+    """Returns the selectable text of a PDF."""
+    reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
+    text = ""
+    for page in reader.pages:
+        page_text = page.extract_text()
+        if page_text:
+            text += page_text
+    return text
 
 def extract_text_from_pdf(uploaded_file):
     """Extracts text from an uploaded PDF file."""
     try:
-        reader = PyPDF2.PdfReader(uploaded_file)
-        text = ""
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text
+        pdf_content = uploaded_file.getvalue()
+        text = loadSharedEngine().run("pdf", cache_key(pdf_content), read_pdf_text, pdf_content)
         
         # If no text extracted, try OCR
         if not text.strip() and OCR_AVAILABLE:
             st.info("��� No selectable text found. Attempting OCR extraction...")
-            uploaded_file.seek(0)  # Reset file pointer
-            pdf_content = uploaded_file.read()
             text = extract_text_with_ocr(pdf_content)
             if text:
                 st.success("✅ Text extracted using OCR!")
@@ -229,13 +249,7 @@ def extract_text_from_gdrive_pdf(file_content):
             st.error("Downloaded content is not a valid PDF file. Please check the Google Drive link and sharing permissions.")
             return None
             
-        pdf_file = io.BytesIO(file_content)
-        reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text
+        text = loadSharedEngine().run("pdf", cache_key(file_content), read_pdf_text, file_content)
         
         # If no text extracted, try OCR
         if not text.strip() and OCR_AVAILABLE:
@@ -257,6 +271,32 @@ def extract_text_from_gdrive_pdf(file_content):
         st.error(f"Error reading PDF from Google Drive: {e}")
         return None
     
+def store_resume_text(store_key, text):
+    """Keeps extracted resume text so re-screens skip download, parsing and OCR."""
+    if text:
+        store = loadResumeStore()
+        store.append(store_key, text, tokens=preprocessText(text).split())
+        # Reclaims superseded records in the background once they pile up
+        loadSharedEngine().executor.submit(store.maybe_compact)
+    return text
+
+def find_keyword_matches(processed_jd, k=10):
+    """Returns (stored text, score) pairs for the stored resumes that use the most JD terms."""
+    store = loadResumeStore()
+    # Holding the lock keeps the ranked rows valid until their text is read back
+    with store.lock:
+        return [(store.text_at(row), score) for row, score in store.rank(processed_jd.split(), k)]
+
+def find_stored_matches(job_description, k=10):
+    """Returns (stored text, score) pairs for the stored resumes closest to a job description."""
+    # Cached resources are looked up here because the worker thread has no session
+    store = loadResumeStore()
+    backend = loadEmbeddingBackend()
+    future = loadSharedEngine().executor.submit(
+        loadStoredResumeIndex().search, store, backend, job_description, k
+    )
+    return future.result()
+
 def get_keyword_analysis(processed_resume, processed_jd):
     """Identifies keywords present and missing from the resume."""
     jd_words = set(processed_jd.split())
@@ -298,7 +338,10 @@ with col1:
     if upload_method == "Upload File":
         uploadedResume = st.file_uploader("Upload your resume in PDF format", type=["pdf"])
         if uploadedResume is not None:
-            resume_text = extract_text_from_pdf(uploadedResume)
+            store_key = "sha1:" + hashlib.sha1(uploadedResume.getvalue()).hexdigest()
+            resume_text = loadResumeStore().get_text(store_key)
+            if resume_text is None:
+                resume_text = store_resume_text(store_key, extract_text_from_pdf(uploadedResume))
     else:
         gdrive_url = st.text_input(
             "Google Drive Link:",
@@ -310,12 +353,32 @@ with col1:
             if "drive.google.com" in gdrive_url:
                 file_id = extract_file_id_from_gdrive_url(gdrive_url)
                 if file_id:
-                    with st.spinner('Downloading file from Google Drive...'):
-                        file_content = download_file_from_gdrive(file_id)
-                        if file_content:
-                            resume_text = extract_text_from_gdrive_pdf(file_content)
-                        else:
-                            st.error("❌ Failed to download file from Google Drive. Please check the link and sharing permissions.")
+                    link_key = "gdrive:" + file_id
+                    linked_key = loadDriveLinks().get_text(link_key)
+                    # The file behind a link can be replaced, so let users re-fetch it once
+                    refresh = st.button(
+                        "Refresh stored copy from Google Drive",
+                        help="Download the file again in case it changed since it was last screened"
+                    )
+                    if linked_key and not refresh:
+                        resume_text = loadResumeStore().get_text(linked_key)
+                    if resume_text is not None:
+                        st.caption("Using the stored copy of this Drive file.")
+                    else:
+                        with st.spinner('Downloading file from Google Drive...'):
+                            file_content = download_file_from_gdrive(file_id)
+                            if file_content:
+                                # Unchanged content skips parsing and OCR via its content hash
+                                content_key = "sha1:" + hashlib.sha1(file_content).hexdigest()
+                                resume_text = loadResumeStore().get_text(content_key)
+                                if resume_text is None:
+                                    resume_text = store_resume_text(content_key, extract_text_from_gdrive_pdf(file_content))
+                                if resume_text and content_key != linked_key:
+                                    links = loadDriveLinks()
+                                    links.append(link_key, content_key)
+                                    loadSharedEngine().executor.submit(links.maybe_compact)
+                            else:
+                                st.error("❌ Failed to download file from Google Drive. Please check the link and sharing permissions.")
                 else:
                     st.error("❌ Could not extract file ID from the Google Drive URL. Please check the link format.")
             else:
@@ -339,12 +402,23 @@ with col2:
     else:
         st.subheader("Custom Job Description:")
         jobDescription = st.text_area("Paste your custom job description here", height=200, key="custom_jd")
+
+    # Semantic scoring catches paraphrases TF-IDF misses, but needs the local model
+    scoring_options = ["TF-IDF (keyword match)"]
+    if EMBEDDINGS_AVAILABLE:
+        scoring_options.append("Semantic (local embeddings)")
+    scoring_engine = st.selectbox("Scoring engine:", options=scoring_options)
     
 if st.button("Analyze Compatibility", type="primary", use_container_width=True):
     if resume_text and jobDescription:
         with st.spinner('Analyzing your documents...'):
-            processedResume = preprocessText(resume_text)
-            processedJd = preprocessText(jobDescription)
+            processedJd = loadSharedEngine().jd_index.get(selected_jd) or preprocessText(jobDescription)
+            # Hobbies, references and personal details are left out of the match
+            section_result = loadSharedEngine().run(
+                "sections", cache_key(resume_text, processedJd),
+                score_resume_sections, resume_text, processedJd, preprocessText
+            )
+            processedResume = section_result["processed"]
             
             if not processedResume or not processedJd:
                 st.error("Could not extract meaningful text from one or both documents. Please check the content.")
@@ -354,7 +428,14 @@ if st.button("Analyze Compatibility", type="primary", use_container_width=True):
                 vectorizer = TfidfVectorizer()
                 try:
                     tfidf_matrix = vectorizer.fit_transform(text_corpus)
-                    similarity_score = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+                    # The per-term breakdown sums to the cosine score, so both come from one pass
+                    explanation = explain_tfidf_scores(tfidf_matrix[0:1], tfidf_matrix[1], vectorizer.get_feature_names_out())[0]
+                    similarity_score = explanation["score"]
+                    if scoring_engine == "Semantic (local embeddings)":
+                        similarity_score = float(loadSharedEngine().run(
+                            "embedding", cache_key(resume_text, jobDescription),
+                            loadEmbeddingBackend().score, [resume_text], jobDescription, offload=True
+                        )[0])
                     
                     st.header("Analysis Results")
                     
@@ -362,13 +443,25 @@ if st.button("Analyze Compatibility", type="primary", use_container_width=True):
                     st.info(f"Analyzed against: **{selected_jd}**")
                     
                     score_percentage = similarity_score * 100
-                    if score_percentage > 30:
+                    if scoring_engine == "Semantic (local embeddings)":
+                        # The match thresholds below are calibrated for TF-IDF; embedding
+                        # cosines sit much higher, so show the raw value without a verdict
+                        st.metric(label="Semantic Similarity (raw cosine)", value=f"{similarity_score:.3f}")
+                    elif score_percentage > 30:
                         st.metric(label="Compatibility Score", value=f"{score_percentage:.2f}%", delta="Good Match!")
                     elif score_percentage > 15:
                         st.metric(label="Compatibility Score", value=f"{score_percentage:.2f}%", delta="Could be improved", delta_color="off")
                     else:
                         st.metric(label="Compatibility Score", value=f"{score_percentage:.2f}%", delta="Poor Match", delta_color="inverse")
 
+                    #SECTION BREAKDOWN
+                    if section_result["sections"]:
+                        st.subheader("Section Breakdown")
+                        st.metric(label="Section-Weighted Score", value=f"{section_result['overall'] * 100:.2f}%")
+                        section_cols = st.columns(len(section_result["sections"]))
+                        for section_col, (section, section_score) in zip(section_cols, section_result["sections"].items()):
+                            section_col.metric(label=section.title(), value=f"{section_score * 100:.2f}%")
+
                     #KEWORD ANALYSIS (HIDDEN)
                     st.subheader("Keyword Analysis")
                     found, missing = get_keyword_analysis(processedResume, processedJd)
@@ -378,8 +471,37 @@ if st.button("Analyze Compatibility", type="primary", use_container_width=True):
 
                     expander_missing = st.expander(f"❌ Keywords Missing ({len(missing)})")
                     expander_missing.warning(", ".join(sorted(missing)))
+
+                    #SCORE BREAKDOWN
+                    if scoring_engine == "TF-IDF (keyword match)":
+                        st.subheader("Why This Score?")
+                        breakdown_col1, breakdown_col2 = st.columns(2)
+                        with breakdown_col1:
+                            st.markdown("**Top contributing terms** (points of the score)")
+                            for term, contribution in explanation["top_terms"]:
+                                st.write(f"{term}: +{contribution * 100:.2f}")
+                        with breakdown_col2:
+                            st.markdown("**Top missing terms** (weight in the job description)")
+                            for term, weight in explanation["missing_terms"]:
+                                st.write(f"{term}: {weight:.2f}")
                 
                 except ValueError as e:
                     st.error(f"An error occurred during vectorization. This can happen if one of the documents has no unique words after processing. Details: {e}")
     else:
         st.warning("Please provide your resume and select/paste a job description to proceed.")
+
+#STORED RESUME SEARCH
+if jobDescription and len(loadResumeStore()):
+    if st.button("Find Best Matches Among Stored Resumes", use_container_width=True):
+        with st.spinner('Searching stored resumes...'):
+            if scoring_engine == "Semantic (local embeddings)":
+                matches = find_stored_matches(jobDescription)
+                score_label = "semantic similarity {:.3f}"
+            else:
+                processedJd = loadSharedEngine().jd_index.get(selected_jd) or preprocessText(jobDescription)
+                matches = find_keyword_matches(processedJd)
+                score_label = "job description keywords make up {:.1%} of the resume"
+        st.header("Best Stored Matches")
+        for stored_text, match_score in matches:
+            first_line = stored_text.strip().splitlines()[0] if stored_text.strip() else "(empty)"
+            st.write(f"**{first_line}** — " + score_label.format(match_score))
@@ -0,0 +1,102 @@
+import argparse
+import glob
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import PyPDF2
+from scipy.stats import spearmanr
+
+from sections import SECTION_WEIGHTS, segment_resume
+from semantic import AnnIndex, EmbeddingBackend, TfidfBackend
+from shared_engine import SharedEngine
+
+
+def load_resumes(folder):
+    """Reads every PDF and text file in a folder."""
+    texts = []
+    for path in sorted(glob.glob(os.path.join(folder, "*"))):
+        if path.lower().endswith(".pdf"):
+            with open(path, "rb") as f:
+                reader = PyPDF2.PdfReader(f)
+                text = "".join(page.extract_text() or "" for page in reader.pages)
+        elif path.lower().endswith(".txt"):
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        else:
+            continue
+        if text.strip():
+            texts.append(text.strip())
+    return texts
+
+
+def time_backend(backend, resume_texts, jd_text):
+    """Scores the resumes and returns (scores, seconds)."""
+    start = time.perf_counter()
+    scores = np.asarray(backend.score(resume_texts, jd_text))
+    return scores, time.perf_counter() - start
+
+
+def ann_recall(vectors, k, queries=100, multi_probe=True, seed=0):
+    """Measures recall@k of the hashed index against an exact scan, using indexed vectors as queries."""
+    index = AnnIndex(vectors, min_rows=0)
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(vectors), size=min(queries, len(vectors)), replace=False)
+    found = 0
+    for i in picks:
+        approx = {row for row, _ in index.query(vectors[i], k, multi_probe=multi_probe)}
+        exact = {row for row, _ in index.query(vectors[i], k, exact=True)}
+        found += len(approx & exact)
+    return found / (len(picks) * min(k, len(vectors)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the TF-IDF and embedding scoring backends.")
+    parser.add_argument("resumes", help="Folder of resume PDFs or text files")
+    parser.add_argument("job_description", help="Text file with the job description")
+    parser.add_argument("--top", type=int, default=10, help="Size of the shortlist to compare")
+    args = parser.parse_args()
+
+    resume_texts = load_resumes(args.resumes)
+    with open(args.job_description, "r", encoding="utf-8") as f:
+        jd_text = f.read()
+    print(f"Loaded {len(resume_texts)} resumes")
+
+    # Match what appSTD.py scores: weighted sections only, lemmatized and stopword-free
+    engine = SharedEngine({})
+    tfidf_texts = [
+        "\n".join(body for name, body in segment_resume(text).items() if SECTION_WEIGHTS.get(name, 0) > 0)
+        for text in resume_texts
+    ]
+    tfidf_scores, tfidf_seconds = time_backend(TfidfBackend(preprocess=engine.preprocess), tfidf_texts, jd_text)
+
+    # A fresh cache directory keeps the cold pass cold on every run
+    cache_dir = tempfile.mkdtemp(prefix="ats-embedding-bench-")
+    try:
+        embedding_backend = EmbeddingBackend(cache_dir=cache_dir)
+        embedding_scores, cold_seconds = time_backend(embedding_backend, resume_texts, jd_text)
+        _, warm_seconds = time_backend(embedding_backend, resume_texts, jd_text)
+        index, owners = embedding_backend.build_index(resume_texts)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    for label, seconds in [("TF-IDF", tfidf_seconds), ("Embedding (cold cache)", cold_seconds),
+                           ("Embedding (warm cache)", warm_seconds)]:
+        print(f"{label:24} {seconds:8.3f}s  {len(resume_texts) / seconds:10.1f} resumes/s")
+
+    top = min(args.top, len(resume_texts))
+    tfidf_top = set(np.argsort(-tfidf_scores)[:top].tolist())
+    embedding_top = set(np.argsort(-embedding_scores)[:top].tolist())
+    print(f"Spearman rank correlation: {spearmanr(tfidf_scores, embedding_scores).correlation:.3f}")
+    print(f"Top-{top} overlap: {len(tfidf_top & embedding_top)}/{top}")
+
+    # The app falls back to an exact scan for small archives, so force hashing here
+    for label, multi_probe in [("single bucket", False), ("multi-probe", True)]:
+        recall = ann_recall(index.vectors, top, multi_probe=multi_probe)
+        print(f"ANN recall@{top} over {len(owners)} chunks ({label}): {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+import hashlib
+import os
+import threading
+import zlib
+
+import numpy as np
+
+# One fixed-size entry per append, so the index itself can be memory-mapped
+INDEX_DTYPE = np.dtype([
+    ("key", "S40"),
+    ("text_offset", "<u8"),
+    ("text_length", "<u4"),
+    ("token_offset", "<u8"),
+    ("token_length", "<u4"),
+    ("score_offset", "<u8"),
+    ("score_length", "<u4"),
+    ("deleted", "u1"),
+])
+
+TEXT_FILE = "text.dat"
+TOKEN_FILE = "tokens.u32"
+SCORE_FILE = "scores.f32"
+INDEX_FILE = "index.bin"
+CURRENT_FILE = "CURRENT"
+
+# rank() reads the token file in windows of this many tokens (16 MB), so its
+# memory use stays flat however large the archive grows
+RANK_CHUNK_TOKENS = 4 * 1024 * 1024
+
+# maybe_compact() waits for at least this many dead entries, and for them to
+# outnumber the live records, so small stores aren't rewritten on every replace
+COMPACT_MIN_DEAD = 64
+
+
+def hash_key(key):
+    """Returns the fixed-width digest a key is indexed under."""
+    return hashlib.sha1(key.encode("utf-8")).hexdigest().encode("ascii")
+
+
+def token_ids(tokens):
+    """Maps tokens to stable 32-bit ids so they can be stored without a vocabulary."""
+    return np.fromiter((zlib.crc32(token.encode("utf-8")) for token in tokens), dtype=np.uint32)
+
+
+def _map(path, dtype):
+    """Memory-maps a whole file, or returns an empty array for an empty one."""
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+def _fsync_dir(path):
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class ResumeStore:
+    """Append-only store of extracted resume text, token ids and score vectors.
+
+    Records live in three data files plus a fixed-width offset index, all read
+    through memory maps. Data is fsynced before its index entry is written, so
+    after a crash anything past the last complete index entry is discarded on open.
+    Compaction writes a new generation directory and switches to it atomically.
+
+    Score vectors are for library callers that precompute per-resume scores; the
+    apps only store text and token ids.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        current_path = os.path.join(path, CURRENT_FILE)
+        if os.path.exists(current_path):
+            with open(current_path, "r", encoding="utf-8") as f:
+                self.generation = f.read().strip()
+        else:
+            self.generation = self._new_generation(1)
+            self._set_current(self.generation)
+        self._recover()
+        self._open()
+
+    def _generation_path(self, generation):
+        return os.path.join(self.path, generation)
+
+    def _file(self, name, generation=None):
+        return os.path.join(self._generation_path(generation or self.generation), name)
+
+    def _new_generation(self, number):
+        generation = f"gen-{number:06d}"
+        os.makedirs(self._generation_path(generation), exist_ok=True)
+        for name in (TEXT_FILE, TOKEN_FILE, SCORE_FILE, INDEX_FILE):
+            open(self._file(name, generation), "wb").close()
+        return generation
+
+    def _set_current(self, generation):
+        tmp_path = os.path.join(self.path, CURRENT_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(generation)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.path, CURRENT_FILE))
+        _fsync_dir(self.path)
+
+    def _recover(self):
+        """Drops a torn index entry and any data appended after the last complete one."""
+        entry_size = INDEX_DTYPE.itemsize
+        index_size = os.path.getsize(self._file(INDEX_FILE))
+        complete = index_size - index_size % entry_size
+        ends = {TEXT_FILE: 0, TOKEN_FILE: 0, SCORE_FILE: 0}
+        if complete:
+            with open(self._file(INDEX_FILE), "rb") as f:
+                f.seek(complete - entry_size)
+                last = np.frombuffer(f.read(entry_size), dtype=INDEX_DTYPE)[0]
+            ends = {
+                TEXT_FILE: int(last["text_offset"]) + int(last["text_length"]),
+                TOKEN_FILE: (int(last["token_offset"]) + int(last["token_length"])) * 4,
+                SCORE_FILE: (int(last["score_offset"]) + int(last["score_length"])) * 4,
+            }
+        for name, end in [(INDEX_FILE, complete)] + list(ends.items()):
+            if os.path.getsize(self._file(name)) != end:
+                with open(self._file(name), "r+b") as f:
+                    f.truncate(end)
+
+    def _remap(self):
+        self.index = _map(self._file(INDEX_FILE), INDEX_DTYPE)
+        self.text_data = _map(self._file(TEXT_FILE), np.uint8)
+        self.token_data = _map(self._file(TOKEN_FILE), np.uint32)
+        self.score_data = _map(self._file(SCORE_FILE), np.float32)
+
+    def _open(self):
+        self._remap()
+        # Later entries supersede earlier ones for the same key
+        self.rows = {key: row for row, key in enumerate(self.index["key"].tolist())}
+        deleted = self.index["deleted"]
+        self.live = {row for row in self.rows.values() if not deleted[row]}
+        self._live_rows = None
+
+    @property
+    def live_rows(self):
+        """Sorted index rows of the records that are neither superseded nor deleted."""
+        # Built on demand so appends stay O(1) while an archive is ingested
+        if self._live_rows is None:
+            self._live_rows = np.array(sorted(self.live), dtype=np.int64)
+        return self._live_rows
+
+    def __len__(self):
+        return len(self.live)
+
+    def __contains__(self, key):
+        row = self.rows.get(hash_key(key))
+        return row is not None and not self.index[row]["deleted"]
+
+    def _append_entry(self, key, text=b"", tokens=None, scores=None):
+        tokens = np.ascontiguousarray(tokens if tokens is not None else [], dtype=np.uint32)
+        scores = np.ascontiguousarray(scores if scores is not None else [], dtype=np.float32)
+        entry = np.zeros(1, dtype=INDEX_DTYPE)
+        entry["key"] = hash_key(key)
+        entry["deleted"] = 0
+        for name, field, payload, width in [
+            (TEXT_FILE, "text", text, 1),
+            (TOKEN_FILE, "token", tokens.tobytes(), 4),
+            (SCORE_FILE, "score", scores.tobytes(), 4),
+        ]:
+            with open(self._file(name), "ab") as f:
+                entry[f"{field}_offset"] = f.tell() // width
+                entry[f"{field}_length"] = len(payload) // width
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+        return entry
+
+    def _write_entry(self, entry):
+        row = len(self.index)
+        with open(self._file(INDEX_FILE), "ab") as f:
+            f.write(entry.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        self._remap()
+        key = entry["key"][0]
+        previous = self.rows.get(key)
+        self.rows[key] = row
+        if previous is not None:
+            self.live.discard(previous)
+        if not entry["deleted"][0]:
+            self.live.add(row)
+        self._live_rows = None
+
+    def append(self, key, text, tokens=(), scores=()):
+        """Stores a resume, replacing any earlier record with the same key."""
+        with self.lock:
+            entry = self._append_entry(key, text.encode("utf-8"), token_ids(tokens), scores)
+            self._write_entry(entry)
+
+    def delete(self, key):
+        """Marks a resume as deleted; its space is reclaimed by compact()."""
+        with self.lock:
+            entry = self._append_entry(key)
+            entry["deleted"] = 1
+            self._write_entry(entry)
+
+    def _row(self, key):
+        row = self.rows.get(hash_key(key))
+        if row is None or self.index[row]["deleted"]:
+            return None
+        return self.index[row]
+
+    def get_text(self, key):
+        """Returns the stored text for a key, or None."""
+        entry = self._row(key)
+        if entry is None:
+            return None
+        start = int(entry["text_offset"])
+        return self.text_data[start:start + int(entry["text_length"])].tobytes().decode("utf-8")
+
+    def get_tokens(self, key):
+        """Returns a read-only view of the stored token ids for a key, or None."""
+        entry = self._row(key)
+        if entry is None:
+            return None
+        start = int(entry["token_offset"])
+        return self.token_data[start:start + int(entry["token_length"])]
+
+    def get_scores(self, key):
+        """Returns a read-only view of the stored score vector for a key, or None."""
+        entry = self._row(key)
+        if entry is None:
+            return None
+        start = int(entry["score_offset"])
+        return self.score_data[start:start + int(entry["score_length"])]
+
+    def rank(self, jd_tokens, k=10):
+        """Ranks every live resume by how densely it uses the job description's terms.
+
+        Streams the live records' tokens from the memory map in fixed-size windows,
+        so cost is bound by reading the file rather than by per-resume Python work
+        or by RAM. Returns (row, score) pairs; use text_at(row) to read a result back.
+        """
+        live_rows = self.live_rows
+        entries = self.index[live_rows]
+        if not len(entries):
+            return []
+        jd_ids = np.unique(token_ids(jd_tokens))
+        starts = entries["token_offset"].astype(np.int64)
+        lengths = entries["token_length"].astype(np.int64)
+        ends = starts + lengths
+        counts = np.zeros(len(entries), dtype=np.int64)
+
+        # Rows are appended in order, so live records sit at increasing offsets
+        first = 0
+        while first < len(entries):
+            low = starts[first]
+            last = max(first + 1, int(np.searchsorted(ends, low + RANK_CHUNK_TOKENS, side="right")))
+            high = ends[last - 1]
+            # A trailing False keeps every record end a valid reduceat index
+            hits = np.zeros(high - low + 1, dtype=bool)
+            hits[:-1] = np.isin(self.token_data[low:high], jd_ids)
+            bounds = np.empty(2 * (last - first), dtype=np.int64)
+            bounds[0::2] = starts[first:last] - low
+            bounds[1::2] = ends[first:last] - low
+            # Sums over [start, end) for each record; the [end, next start) gaps are dead data
+            counts[first:last] = np.add.reduceat(hits, bounds, dtype=np.int64)[0::2]
+            first = last
+        counts[lengths == 0] = 0
+        scores = counts / np.maximum(lengths, 1)
+        top = np.argsort(-scores, kind="stable")[:k]
+        return [(int(live_rows[i]), float(scores[i])) for i in top]
+
+    def text_at(self, row):
+        """Returns the stored text for an index row."""
+        entry = self.index[row]
+        start = int(entry["text_offset"])
+        return self.text_data[start:start + int(entry["text_length"])].tobytes().decode("utf-8")
+
+    def maybe_compact(self):
+        """Compacts once superseded and deleted entries outnumber the live records."""
+        with self.lock:
+            dead = len(self.index) - len(self.live)
+            if dead < COMPACT_MIN_DEAD or dead <= len(self.live):
+                return False
+            self._compact()
+            return True
+
+    def compact(self):
+        """Rewrites only live records into a new generation and switches to it."""
+        with self.lock:
+            self._compact()
+
+    def _compact(self):
+        old_generation = self.generation
+        number = int(old_generation.split("-")[1]) + 1
+        new_generation = self._new_generation(number)
+        entries = self.index[self.live_rows]
+        new_index = np.zeros(len(entries), dtype=INDEX_DTYPE)
+        new_index["key"] = entries["key"]
+        for name, field, data in [
+            (TEXT_FILE, "text", self.text_data),
+            (TOKEN_FILE, "token", self.token_data),
+            (SCORE_FILE, "score", self.score_data),
+        ]:
+            offset = 0
+            with open(self._file(name, new_generation), "wb") as f:
+                for i, entry in enumerate(entries):
+                    start = int(entry[f"{field}_offset"])
+                    length = int(entry[f"{field}_length"])
+                    f.write(data[start:start + length].tobytes())
+                    new_index[i][f"{field}_offset"] = offset
+                    new_index[i][f"{field}_length"] = length
+                    offset += length
+                f.flush()
+                os.fsync(f.fileno())
+        with open(self._file(INDEX_FILE, new_generation), "wb") as f:
+            f.write(new_index.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        _fsync_dir(self._generation_path(new_generation))
+        self._set_current(new_generation)
+        self.generation = new_generation
+        self._open()
+        for name in (TEXT_FILE, TOKEN_FILE, SCORE_FILE, INDEX_FILE):
+            os.remove(self._file(name, old_generation))
+        os.rmdir(self._generation_path(old_generation))
@@ -0,0 +1,105 @@
+import re
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+# Header spellings seen on resumes, grouped by the section they open
+SECTION_HEADERS = {
+    "summary": ["summary", "professional summary", "profile", "career objective", "objective", "about me"],
+    "experience": ["experience", "work experience", "professional experience", "employment history",
+                   "work history", "internship", "internships", "internship experience"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "technologies",
+               "tools and technologies", "tech stack"],
+    "projects": ["projects", "academic projects", "personal projects", "key projects"],
+    "education": ["education", "academic background", "academic details", "qualifications",
+                  "educational qualifications"],
+    "certifications": ["certifications", "certificates", "courses", "licenses and certifications"],
+    "achievements": ["achievements", "awards", "honors", "accomplishments"],
+    "hobbies": ["hobbies", "interests", "hobbies and interests", "extracurricular activities"],
+    "personal": ["personal details", "personal information", "declaration"],
+    "references": ["references"],
+}
+
+# How much each section counts towards the weighted score. Sections with weight 0
+# are dropped before preprocessing so they never reach the vectorizer.
+SECTION_WEIGHTS = {
+    "experience": 0.30,
+    "skills": 0.25,
+    "projects": 0.20,
+    "summary": 0.08,
+    "certifications": 0.07,
+    "education": 0.05,
+    "achievements": 0.05,
+    "other": 0.05,
+    "hobbies": 0.0,
+    "personal": 0.0,
+    "references": 0.0,
+}
+
+HEADER_LOOKUP = {header: section for section, headers in SECTION_HEADERS.items() for header in headers}
+# Labels that also appear inline inside a job or project entry ("Tech stack: React").
+# Inline, they never open a new section, wherever they appear.
+INLINE_ONLY_HEADERS = {"technologies", "tools and technologies", "tech stack", "courses"}
+MAX_HEADER_WORDS = 4
+
+
+def normalize_header(line):
+    """Reduces a line to the lowercase words used for header lookup."""
+    return " ".join(re.sub(r"[^a-z& ]", " ", line.lower()).replace("&", " and ").split())
+
+
+def segment_resume(text):
+    """Splits resume text into sections in a single pass over its lines."""
+    sections = {}
+    current = "other"
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        head, sep, rest = stripped.partition(":")
+        if len(head.split()) <= MAX_HEADER_WORDS:
+            header = normalize_header(head)
+            section = HEADER_LOOKUP.get(header)
+            # Inside a weighted section, "Skills: led migration" is part of an entry:
+            # its content goes to that section but the entry carries on afterwards.
+            # Before any section, or after an ignored one, it opens the section.
+            inline = section and rest.strip() and (
+                header in INLINE_ONLY_HEADERS or (current != "other" and SECTION_WEIGHTS.get(current, 0) > 0)
+            )
+            if inline:
+                sections.setdefault(section, []).append(rest.strip())
+                continue
+            if section:
+                current = section
+                if not rest.strip():
+                    continue
+                stripped = rest.strip()
+        sections.setdefault(current, []).append(stripped)
+    return {name: "\n".join(lines) for name, lines in sections.items()}
+
+
+def score_resume_sections(resume_text, processed_jd, preprocess):
+    """Scores each weighted resume section against the processed job description."""
+    names = []
+    documents = []
+    for name, body in segment_resume(resume_text).items():
+        if SECTION_WEIGHTS.get(name, 0) <= 0:
+            continue
+        processed = preprocess(body)
+        if processed:
+            names.append(name)
+            documents.append(processed)
+
+    if not names or not processed_jd:
+        return {"overall": 0.0, "sections": {}, "processed": " ".join(documents)}
+
+    # One vectorizer over the JD and every kept section keeps the vocabulary shared
+    vectorizer = TfidfVectorizer()
+    tfidf_matrix = vectorizer.fit_transform([processed_jd] + documents)
+    scores = cosine_similarity(tfidf_matrix[1:], tfidf_matrix[0:1]).ravel()
+
+    section_scores = dict(zip(names, scores.tolist()))
+    total_weight = sum(SECTION_WEIGHTS[name] for name in names)
+    overall = sum(SECTION_WEIGHTS[name] * score for name, score in section_scores.items()) / total_weight
+
+    return {"overall": overall, "sections": section_scores, "processed": " ".join(documents)}
@@ -0,0 +1,371 @@
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from sections import SECTION_WEIGHTS, segment_resume
+
+# Cross-process locking for the embedding cache (POSIX only)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Local embedding imports
+try:
+    from sentence_transformers import SentenceTransformer
+    EMBEDDINGS_AVAILABLE = True
+except ImportError:
+    EMBEDDINGS_AVAILABLE = False
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_CACHE_DIR = "embedding_cache"
+EMBEDDING_BATCH_SIZE = 32
+# all-MiniLM-L6-v2 truncates at 256 word pieces, so text is embedded in windows
+# short enough to be read whole
+CHUNK_WORDS = 200
+
+# Below this many indexed resumes an exact scan is cheaper than hashing
+ANN_MIN_ROWS = 2048
+ANN_TABLES = 4
+ANN_BITS = 12
+
+
+def content_hash(text):
+    """Returns the cache key for a piece of text."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def chunk_words(text, size=CHUNK_WORDS):
+    """Splits text into windows of at most size words."""
+    words = text.split()
+    return [" ".join(words[start:start + size]) for start in range(0, len(words), size)]
+
+
+def chunk_resume(text):
+    """Splits a resume into per-section windows, skipping sections that don't affect the match."""
+    chunks = []
+    for name, body in segment_resume(text).items():
+        if SECTION_WEIGHTS.get(name, 0) > 0:
+            chunks.extend(chunk_words(body))
+    return chunks or chunk_words(text) or [text]
+
+
+def explain_tfidf_scores(resume_matrix, jd_vector, feature_names, top=10):
+    """Splits each resume's TF-IDF cosine score into per-term contributions.
+
+    TfidfVectorizer L2-normalises its rows, so a resume's cosine with the JD is the
+    sum of resume weight * JD weight over their shared terms. One pass over the
+    sparse rows gives each score together with its largest contributing terms and
+    the heaviest JD terms the resume is missing.
+    """
+    resume_matrix = resume_matrix.tocsr()
+    jd_weights = jd_vector.toarray().ravel()
+    jd_terms = np.flatnonzero(jd_weights)
+    jd_terms = jd_terms[np.argsort(-jd_weights[jd_terms], kind="stable")]
+    contributions = resume_matrix.data * jd_weights[resume_matrix.indices]
+
+    explanations = []
+    for row in range(resume_matrix.shape[0]):
+        start, end = resume_matrix.indptr[row], resume_matrix.indptr[row + 1]
+        row_terms = resume_matrix.indices[start:end]
+        row_contributions = contributions[start:end]
+        order = np.argsort(-row_contributions, kind="stable")[:top]
+        order = order[row_contributions[order] > 0]
+        missing = jd_terms[~np.isin(jd_terms, row_terms)][:top]
+        explanations.append({
+            "score": float(row_contributions.sum()),
+            "top_terms": [(feature_names[row_terms[i]], float(row_contributions[i])) for i in order],
+            "missing_terms": [(feature_names[term], float(jd_weights[term])) for term in missing],
+        })
+    return explanations
+
+
+class TfidfBackend:
+    """Scores resumes with TF-IDF cosine similarity, as the apps always have."""
+
+    name = "tfidf"
+
+    def __init__(self, preprocess=None):
+        self.preprocess = preprocess
+
+    def _fit(self, resume_texts, jd_text):
+        if self.preprocess:
+            resume_texts = [self.preprocess(text) for text in resume_texts]
+            jd_text = self.preprocess(jd_text)
+        vectorizer = TfidfVectorizer()
+        tfidf_matrix = vectorizer.fit_transform(list(resume_texts) + [jd_text])
+        return vectorizer, tfidf_matrix
+
+    def score(self, resume_texts, jd_text):
+        """Returns one similarity score per resume."""
+        _, tfidf_matrix = self._fit(resume_texts, jd_text)
+        return cosine_similarity(tfidf_matrix[:-1], tfidf_matrix[-1:]).ravel()
+
+    def explain(self, resume_texts, jd_text, top=10):
+        """Returns one score breakdown per resume; see explain_tfidf_scores."""
+        vectorizer, tfidf_matrix = self._fit(resume_texts, jd_text)
+        return explain_tfidf_scores(tfidf_matrix[:-1], tfidf_matrix[-1], vectorizer.get_feature_names_out(), top)
+
+
+class EmbeddingCache:
+    """Append-only, memory-mapped matrix of embeddings keyed by content hash.
+
+    Several processes may share a cache directory on POSIX systems: appends hold
+    an exclusive lock on a sidecar file and first pick up rows other processes
+    wrote. Without fcntl (Windows) the cache must only be used by one process.
+    """
+
+    def __init__(self, cache_dir, dim):
+        self.dim = dim
+        self.vectors_path = os.path.join(cache_dir, f"vectors-{dim}.f32")
+        self.keys_path = os.path.join(cache_dir, f"keys-{dim}.txt")
+        self.lock_path = os.path.join(cache_dir, f"keys-{dim}.lock")
+        os.makedirs(cache_dir, exist_ok=True)
+        # Row numbers follow key lines, not distinct keys: a key written twice still
+        # owns two rows, and lookups use the first one
+        self.rows = {}
+        self.count = 0
+        self.keys_offset = 0
+        # Concurrent sessions share one cache through st.cache_resource
+        self.lock = threading.Lock()
+        with self.lock, self._file_lock():
+            self._reload(repair=True)
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _reload(self, repair=False):
+        """Reads key lines appended since the last reload, by this or another process."""
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path, "rb") as f:
+                f.seek(self.keys_offset)
+                content = f.read()
+            complete = content[:content.rfind(b"\n") + 1]
+            if repair and len(complete) != len(content):
+                # Drop a key line torn by an interrupted append
+                with open(self.keys_path, "r+b") as f:
+                    f.truncate(self.keys_offset + len(complete))
+            for key in complete.decode("utf-8").splitlines():
+                self.rows.setdefault(key, self.count)
+                self.count += 1
+            self.keys_offset += len(complete)
+        self._open()
+
+    def _open(self):
+        # Keys are written after their vectors, so rows past the last key are an
+        # interrupted append and are simply never read
+        if self.count:
+            self.matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self.count, self.dim))
+        else:
+            self.matrix = np.empty((0, self.dim), dtype=np.float32)
+
+    def add(self, keys, vectors):
+        """Appends new vectors to the cache, skipping keys another thread or process already added."""
+        with self.lock, self._file_lock():
+            # Another process may have appended since we last looked; its rows must
+            # be counted before the vectors file is trimmed to our row count
+            self._reload(repair=True)
+            new = [i for i, key in enumerate(keys) if key not in self.rows]
+            if not new:
+                return
+            keys = [keys[i] for i in new]
+            vectors = np.ascontiguousarray(np.asarray(vectors)[new], dtype=np.float32)
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(self.count * self.dim * 4)
+                f.write(vectors.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.keys_path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{key}\n" for key in keys))
+                f.flush()
+                os.fsync(f.fileno())
+            self._reload()
+
+    def get(self, keys):
+        """Returns the cached vectors for the given keys, in order."""
+        with self.lock:
+            return self.matrix[[self.rows[key] for key in keys]]
+
+
+class AnnIndex:
+    """Approximate nearest-neighbour index over unit vectors using random hyperplanes."""
+
+    def __init__(self, vectors, tables=ANN_TABLES, bits=ANN_BITS, seed=0, min_rows=ANN_MIN_ROWS):
+        self.vectors = vectors
+        self.exact = len(vectors) < min_rows
+        if self.exact:
+            return
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((tables, bits, vectors.shape[1])).astype(np.float32)
+        self.powers = 1 << np.arange(bits)
+        self.buckets = []
+        for planes in self.planes:
+            codes = (vectors @ planes.T > 0) @ self.powers
+            order = np.argsort(codes, kind="stable")
+            unique, starts = np.unique(codes[order], return_index=True)
+            self.buckets.append(dict(zip(unique.tolist(), np.split(order, starts[1:]))))
+
+    def query(self, vector, k=10, exact=False, multi_probe=True):
+        """Returns (row, score) pairs for the k closest indexed vectors."""
+        if self.exact or exact:
+            candidates = np.arange(len(self.vectors))
+        else:
+            # Probe each table's bucket plus its one-bit neighbours to recover near misses
+            hits = []
+            for planes, buckets in zip(self.planes, self.buckets):
+                code = int((planes @ vector > 0) @ self.powers)
+                probes = [code] + [code ^ int(power) for power in self.powers] if multi_probe else [code]
+                for probe in probes:
+                    if probe in buckets:
+                        hits.append(buckets[probe])
+            candidates = np.unique(np.concatenate(hits)) if hits else np.empty(0, dtype=np.int64)
+            if len(candidates) < k:
+                candidates = np.arange(len(self.vectors))
+        scores = self.vectors[candidates] @ vector
+        top = np.argsort(-scores)[:k]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+
+class EmbeddingBackend:
+    """Scores resumes with dense embeddings from a small local CPU model."""
+
+    name = "embedding"
+
+    def __init__(self, model_name=EMBEDDING_MODEL, cache_dir=EMBEDDING_CACHE_DIR, batch_size=EMBEDDING_BATCH_SIZE):
+        if not EMBEDDINGS_AVAILABLE:
+            raise RuntimeError("Install sentence-transformers to use the embedding backend.")
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.batch_size = batch_size
+        self.cache = EmbeddingCache(cache_dir, self.model.get_sentence_embedding_dimension())
+
+    def embed(self, texts):
+        """Returns unit-length embeddings, computing only those not already cached."""
+        keys = [content_hash(text) for text in texts]
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in self.cache.rows and key not in missing:
+                missing[key] = text
+        if missing:
+            vectors = self.model.encode(
+                list(missing.values()),
+                batch_size=self.batch_size,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+            )
+            self.cache.add(list(missing.keys()), vectors)
+        return self.cache.get(keys)
+
+    def embed_job_description(self, jd_text):
+        """Returns one unit vector for a job description, averaged over its windows."""
+        vector = self.embed(chunk_words(jd_text) or [jd_text]).mean(axis=0)
+        return vector / np.linalg.norm(vector)
+
+    def score(self, resume_texts, jd_text):
+        """Returns one similarity score per resume: its best-matching chunk against the JD."""
+        if not resume_texts:
+            return np.empty(0, dtype=np.float32)
+        resume_chunks = [chunk_resume(text) for text in resume_texts]
+        jd_chunks = chunk_words(jd_text) or [jd_text]
+        # Every chunk of every resume, plus the JD, goes through the model in one batch
+        vectors = self.embed([chunk for chunks in resume_chunks for chunk in chunks] + jd_chunks)
+        jd_vector = vectors[-len(jd_chunks):].mean(axis=0)
+        jd_vector /= np.linalg.norm(jd_vector)
+        chunk_scores = vectors[:-len(jd_chunks)] @ jd_vector
+        starts = np.cumsum([0] + [len(chunks) for chunks in resume_chunks[:-1]])
+        return np.maximum.reduceat(chunk_scores, starts)
+
+    def build_index(self, resume_texts):
+        """Indexes resume chunks; returns (index, owners) where owners maps chunk to resume position."""
+        resume_chunks = [chunk_resume(text) for text in resume_texts]
+        owners = np.repeat(np.arange(len(resume_chunks)), [len(chunks) for chunks in resume_chunks])
+        vectors = self.embed([chunk for chunks in resume_chunks for chunk in chunks])
+        return AnnIndex(np.asarray(vectors)), owners
+
+    def query(self, index, owners, jd_text, k=10):
+        """Returns (resume position, score) pairs for the resumes whose best chunk matches the JD best."""
+        jd_vector = self.embed_job_description(jd_text)
+        # Several chunks can belong to one resume, so widen the search until k resumes turn up
+        fetch = k * 4
+        while True:
+            best = {}
+            for row, score in index.query(jd_vector, fetch):
+                best.setdefault(int(owners[row]), score)
+            if len(best) >= k or fetch >= len(owners):
+                return list(best.items())[:k]
+            fetch *= 2
+
+
+class StoredResumeIndex:
+    """Embedding index over the live resumes of a ResumeStore, kept in step with it.
+
+    Each update embeds only the records added since the last one and drops those
+    that were superseded or deleted. Compaction renumbers rows, so a new store
+    generation starts the index over.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.generation = None
+        self.index = None
+        # The store row each indexed chunk belongs to
+        self.rows = np.empty(0, dtype=np.int64)
+
+    def update(self, store, backend):
+        """Brings the index up to date with the store; returns (generation, index, chunk rows)."""
+        with self.lock:
+            # Rows and texts are read together so appends and compaction can't
+            # slip in between them
+            with store.lock:
+                generation, live_rows = store.generation, store.live_rows
+                if generation != self.generation:
+                    self.index, self.rows = None, np.empty(0, dtype=np.int64)
+                new_rows = np.setdiff1d(live_rows, self.rows)
+                texts = [store.text_at(row) for row in new_rows]
+            keep = np.isin(self.rows, live_rows)
+            if generation != self.generation or len(new_rows) or not keep.all():
+                resume_chunks = [chunk_resume(text) for text in texts]
+                chunk_rows = np.repeat(new_rows, [len(chunks) for chunks in resume_chunks])
+                parts = [self.index.vectors[keep]] if self.index is not None else []
+                if len(chunk_rows):
+                    parts.append(np.asarray(backend.embed([chunk for chunks in resume_chunks for chunk in chunks])))
+                self.rows = np.concatenate([self.rows[keep], chunk_rows])
+                self.index = AnnIndex(np.concatenate(parts)) if len(self.rows) else None
+                self.generation = generation
+            return self.generation, self.index, self.rows
+
+    def search(self, store, backend, jd_text, k=10):
+        """Returns (stored text, score) pairs for the stored resumes closest to a job description."""
+        while True:
+            generation, index, rows = self.update(store, backend)
+            if index is None:
+                return []
+            matches = backend.query(index, rows, jd_text, k)
+            with store.lock:
+                # A compaction since the update renumbered the rows; search again
+                if store.generation == generation:
+                    return [(store.text_at(row), score) for row, score in matches]
+
+
+SCORING_BACKENDS = {
+    TfidfBackend.name: TfidfBackend,
+    EmbeddingBackend.name: EmbeddingBackend,
+}
+
+
+def get_scoring_backend(name, **kwargs):
+    """Creates a scoring backend by name."""
+    return SCORING_BACKENDS[name](**kwargs)
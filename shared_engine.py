@@ -0,0 +1,144 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import nltk
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+from nltk.tokenize import word_tokenize
+
+NLTK_PACKAGES = ["punkt", "stopwords", "wordnet", "punkt_tab", "omw-1.4"]
+
+# Heavy jobs (OCR, embeddings) get their own small pool so they queue behind each
+# other instead of starving every session's script thread
+MAX_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+CACHE_SIZE = 256
+
+# Handed to waiters when the owner was interrupted by a control-flow exception
+_RETRY = object()
+
+
+def cache_key(*parts):
+    """Hashes text or bytes parts into a single cache key."""
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(hashlib.sha1(part).digest())
+    return digest.hexdigest()
+
+
+class SharedEngine:
+    """Process-wide resources and caches shared by every Streamlit session.
+
+    run() coalesces identical concurrent requests: the first caller computes the
+    result, later callers with the same key wait for it, and successful results
+    are kept in a small per-namespace LRU cache.
+    """
+
+    def __init__(self, job_descriptions=None, max_workers=MAX_WORKERS, cache_size=CACHE_SIZE):
+        # NLTK data and the JD index are only loaded once something needs them, so
+        # apps that just want the caches don't pay for them
+        self.job_descriptions = job_descriptions or {}
+        self.nltk_lock = threading.Lock()
+        self.stop_words = None
+        self.lemmatizer = None
+        self._jd_index = None
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ats-worker")
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+        self.caches = {}
+        self.in_flight = {}
+
+    def _load_nltk(self):
+        with self.nltk_lock:
+            if self.lemmatizer is not None:
+                return
+            for package in NLTK_PACKAGES:
+                nltk.download(package, quiet=True)
+            self.stop_words = frozenset(stopwords.words("english"))
+            lemmatizer = WordNetLemmatizer()
+            # WordNet loads lazily and that first load is not thread-safe, so do it here
+            lemmatizer.lemmatize("warmup")
+            self.lemmatizer = lemmatizer
+
+    @property
+    def jd_index(self):
+        """Preprocessed text of each predefined job description, by name."""
+        if self._jd_index is None:
+            self._jd_index = {name: self.preprocess(text) for name, text in self.job_descriptions.items() if text}
+        return self._jd_index
+
+    def preprocess(self, text):
+        """Cleans and preprocesses the input text."""
+        if not text:
+            return ""
+        if self.lemmatizer is None:
+            self._load_nltk()
+        tokens = word_tokenize(text.lower())
+        tokens = [word for word in tokens if word.isalpha() and word not in self.stop_words]
+        return " ".join(self.lemmatizer.lemmatize(word) for word in tokens)
+
+    def run(self, namespace, key, func, *args, offload=False):
+        """Returns func(*args), computed at most once at a time per (namespace, key).
+
+        With offload=True the work runs on the shared worker pool; otherwise the
+        first caller runs it in its own thread. None results are not cached, and
+        coalesced functions must not call st.* since only one session runs them.
+        """
+        while True:
+            with self.lock:
+                cache = self.caches.setdefault(namespace, OrderedDict())
+                if key in cache:
+                    cache.move_to_end(key)
+                    return cache[key]
+                future = self.in_flight.get((namespace, key))
+                owner = future is None
+                if owner:
+                    future = Future()
+                    self.in_flight[(namespace, key)] = future
+
+            if owner and not offload:
+                return self._compute(namespace, key, future, func, args)
+            if owner:
+                self.executor.submit(self._compute_offloaded, namespace, key, future, func, args)
+            result = future.result()
+            if result is not _RETRY:
+                return result
+
+    def _compute(self, namespace, key, future, func, args):
+        """Runs func for the owner of a request and hands the outcome to its waiters."""
+        try:
+            result = func(*args)
+        except Exception as e:
+            self._finish(namespace, key)
+            future.set_exception(e)
+            raise
+        except BaseException:
+            # Streamlit's rerun and stop signals belong to the owner's session
+            # only; waiters go round again and compute the request themselves
+            self._finish(namespace, key)
+            future.set_result(_RETRY)
+            raise
+        self._finish(namespace, key, result)
+        future.set_result(result)
+        return result
+
+    def _compute_offloaded(self, namespace, key, future, func, args):
+        try:
+            self._compute(namespace, key, future, func, args)
+        except BaseException:
+            # Already handed to the callers waiting on the future
+            pass
+
+    def _finish(self, namespace, key, result=None):
+        with self.lock:
+            if result is not None:
+                cache = self.caches[namespace]
+                cache[key] = result
+                if len(cache) > self.cache_size:
+                    cache.popitem(last=False)
+            del self.in_flight[(namespace, key)]
@@ -0,0 +1,142 @@
+import os
+
+import numpy as np
+import pytest
+
+import resume_store
+from resume_store import INDEX_DTYPE, INDEX_FILE, SCORE_FILE, TEXT_FILE, TOKEN_FILE, ResumeStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResumeStore(str(tmp_path / "store"))
+
+
+def test_append_and_read_back(store):
+    store.append("a", "Jane Doe\nPython", ["python", "aws"], [0.5, 0.25])
+    assert "a" in store
+    assert len(store) == 1
+    assert store.get_text("a") == "Jane Doe\nPython"
+    assert store.get_tokens("a").tolist() == resume_store.token_ids(["python", "aws"]).tolist()
+    assert store.get_scores("a").tolist() == [0.5, 0.25]
+    assert store.get_text("missing") is None
+
+
+def test_later_append_replaces_and_delete_hides(store):
+    store.append("a", "old", ["java"])
+    store.append("b", "other", ["sql"])
+    store.append("a", "new", ["python"])
+    assert store.get_text("a") == "new"
+    assert len(store) == 2
+
+    store.delete("b")
+    assert "b" not in store
+    assert store.get_text("b") is None
+    assert store.live_rows.tolist() == [2]
+
+
+def test_rank_orders_by_jd_term_density(store):
+    store.append("dense", "d", ["python", "aws", "python"])
+    store.append("sparse", "s", ["python", "java", "chess", "go"])
+    store.append("none", "n", ["chess"])
+    store.append("empty", "e", [])
+    ranked = store.rank(["python", "aws"], k=4)
+    assert [store.text_at(row) for row, _ in ranked] == ["d", "s", "n", "e"]
+    assert ranked[0][1] == pytest.approx(1.0)
+    assert ranked[1][1] == pytest.approx(0.25)
+
+
+def test_rank_is_the_same_across_window_sizes(store, monkeypatch):
+    rng = np.random.default_rng(0)
+    vocab = [f"w{i}" for i in range(40)]
+    for i in range(200):
+        store.append(f"k{i % 150}", str(i), rng.choice(vocab, size=rng.integers(0, 20)).tolist())
+    for i in range(0, 150, 9):
+        store.delete(f"k{i}")
+    expected = store.rank(vocab[:8], k=200)
+    monkeypatch.setattr(resume_store, "RANK_CHUNK_TOKENS", 7)
+    assert store.rank(vocab[:8], k=200) == expected
+
+
+def test_recover_drops_torn_index_entry_and_orphaned_data(tmp_path):
+    path = str(tmp_path / "store")
+    store = ResumeStore(path)
+    store.append("a", "kept", ["python"], [1.0])
+    sizes = {name: os.path.getsize(store._file(name)) for name in (TEXT_FILE, TOKEN_FILE, SCORE_FILE, INDEX_FILE)}
+
+    # A crash after the data was written but halfway through the index entry
+    for name, payload in [(TEXT_FILE, b"lost"), (TOKEN_FILE, b"\0" * 8), (SCORE_FILE, b"\0" * 4),
+                          (INDEX_FILE, b"\0" * (INDEX_DTYPE.itemsize // 2))]:
+        with open(store._file(name), "ab") as f:
+            f.write(payload)
+
+    reopened = ResumeStore(path)
+    assert {name: os.path.getsize(reopened._file(name)) for name in sizes} == sizes
+    assert len(reopened) == 1
+    assert reopened.get_text("a") == "kept"
+
+    reopened.append("b", "after", ["sql"])
+    assert ResumeStore(path).get_text("b") == "after"
+
+
+def test_compact_keeps_only_live_records(tmp_path):
+    path = str(tmp_path / "store")
+    store = ResumeStore(path)
+    store.append("a", "old a", ["java"], [0.1])
+    store.append("b", "b", ["sql"], [0.2])
+    store.append("a", "new a", ["python", "aws"], [0.3, 0.4])
+    store.append("c", "c", ["go"])
+    store.delete("c")
+    old_generation = store.generation
+
+    store.compact()
+
+    assert store.generation != old_generation
+    assert not os.path.exists(os.path.join(path, old_generation))
+    assert len(store.index) == 2
+    assert os.path.getsize(store._file(TEXT_FILE)) == len("new a") + len("b")
+
+    reopened = ResumeStore(path)
+    assert reopened.generation == store.generation
+    assert reopened.get_text("a") == "new a"
+    assert reopened.get_tokens("a").tolist() == resume_store.token_ids(["python", "aws"]).tolist()
+    assert reopened.get_scores("a").tolist() == pytest.approx([0.3, 0.4])
+    assert reopened.get_text("b") == "b"
+    assert "c" not in reopened
+    assert [reopened.text_at(row) for row, _ in reopened.rank(["python"], k=1)] == ["new a"]
+
+
+def test_interrupted_compaction_leaves_current_generation_in_use(tmp_path):
+    path = str(tmp_path / "store")
+    store = ResumeStore(path)
+    store.append("a", "text", ["python"])
+    # A half-written next generation that CURRENT was never switched to
+    os.makedirs(os.path.join(path, "gen-000002"))
+    with open(os.path.join(path, "gen-000002", TEXT_FILE), "wb") as f:
+        f.write(b"partial")
+
+    reopened = ResumeStore(path)
+    assert reopened.generation == store.generation
+    assert reopened.get_text("a") == "text"
+    reopened.compact()
+    assert reopened.get_text("a") == "text"
+    assert os.path.getsize(reopened._file(TEXT_FILE)) == len("text")
+
+
+def test_maybe_compact_waits_for_dead_records_to_outnumber_live_ones(store, monkeypatch):
+    monkeypatch.setattr(resume_store, "COMPACT_MIN_DEAD", 3)
+    for key in "abcd":
+        store.append(key, key, [key])
+    for key in "abc":
+        store.append(key, key + "2", [key])
+    # Three superseded entries against four live records
+    assert not store.maybe_compact()
+    generation = store.generation
+
+    # The delete kills d and its own tombstone entry is dead too
+    store.delete("d")
+    assert store.maybe_compact()
+    assert store.generation != generation
+    assert len(store.index) == len(store) == 3
+    assert [store.get_text(key) for key in "abc"] == ["a2", "b2", "c2"]
+    assert not store.maybe_compact()
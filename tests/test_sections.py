@@ -0,0 +1,50 @@
+import pytest
+
+from sections import score_resume_sections, segment_resume
+
+
+def test_headers_open_sections():
+    sections = segment_resume(
+        "Jane Doe\njane@example.com\nSUMMARY\nData engineer\nWork Experience\nBuilt ETL pipelines\n"
+        "Hobbies & Interests\nChess\n"
+    )
+    assert sections == {
+        "other": "Jane Doe\njane@example.com",
+        "summary": "Data engineer",
+        "experience": "Built ETL pipelines",
+        "hobbies": "Chess",
+    }
+
+
+def test_inline_header_before_any_section_opens_it():
+    sections = segment_resume("Jane Doe\nTechnical Skills: Python, SQL\nAWS\n")
+    assert sections == {"other": "Jane Doe", "skills": "Python, SQL\nAWS"}
+
+
+def test_inline_label_inside_an_entry_keeps_the_section():
+    sections = segment_resume(
+        "Experience\nData Engineer at Acme\nSkills: led migration\nMoved jobs to Airflow\n"
+        "Projects\nATS tool\nTech stack: React, Node\nBuilt a parser\n"
+    )
+    assert sections["experience"] == "Data Engineer at Acme\nMoved jobs to Airflow"
+    assert sections["projects"] == "ATS tool\nBuilt a parser"
+    assert sections["skills"] == "led migration\nReact, Node"
+
+
+def test_inline_only_labels_never_switch_sections():
+    sections = segment_resume("Jane Doe\nTechnologies: Docker\nContact me anytime\n")
+    assert sections == {"other": "Jane Doe\nContact me anytime", "skills": "Docker"}
+
+
+def test_inline_header_after_an_ignored_section_opens_it():
+    sections = segment_resume("Hobbies\nChess\nSkills: Python\nSQL\n")
+    assert sections == {"hobbies": "Chess", "skills": "Python\nSQL"}
+
+
+def test_zero_weight_sections_are_not_scored():
+    result = score_resume_sections(
+        "Skills\npython aws\nHobbies\npython chess", "python aws", lambda text: text.lower()
+    )
+    assert set(result["sections"]) == {"skills"}
+    assert result["processed"] == "python aws"
+    assert result["overall"] == pytest.approx(result["sections"]["skills"])
@@ -0,0 +1,140 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from resume_store import ResumeStore
+from semantic import EmbeddingBackend, EmbeddingCache, StoredResumeIndex, TfidfBackend, explain_tfidf_scores
+
+RESUMES = [
+    "python developer with aws and docker experience python",
+    "java engineer who knows sql",
+    "python data analyst using sql and pandas",
+]
+JOB_DESCRIPTION = "python developer aws docker kubernetes sql"
+
+
+def vectors(*values):
+    return np.array([[value] * 4 for value in values], dtype=np.float32)
+
+
+def test_cache_round_trips_and_skips_known_keys(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), 4)
+    cache.add(["a", "b"], vectors(1, 2))
+    cache.add(["b", "c"], vectors(9, 3))
+    assert cache.count == 3
+    assert EmbeddingCache(str(tmp_path), 4).get(["c", "a", "b"]).tolist() == vectors(3, 1, 2).tolist()
+
+
+def test_duplicate_and_torn_key_lines_keep_rows_aligned(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), 4)
+    cache.add(["a", "b"], vectors(1, 2))
+    # A repeated key with its own vector row, then a key line torn mid-write
+    with open(cache.vectors_path, "ab") as f:
+        f.write(vectors(7).tobytes())
+    with open(cache.keys_path, "a") as f:
+        f.write("a\nzz")
+
+    reopened = EmbeddingCache(str(tmp_path), 4)
+    assert reopened.count == 3
+    assert reopened.get(["a", "b"]).tolist() == vectors(1, 2).tolist()
+    reopened.add(["c"], vectors(3))
+    assert EmbeddingCache(str(tmp_path), 4).get(["c", "a"]).tolist() == vectors(3, 1).tolist()
+
+
+def test_two_instances_sharing_a_directory(tmp_path):
+    first = EmbeddingCache(str(tmp_path), 4)
+    second = EmbeddingCache(str(tmp_path), 4)
+    first.add(["a"], vectors(1))
+    second.add(["b"], vectors(2))
+    first.add(["c", "b"], vectors(3, 9))
+
+    reopened = EmbeddingCache(str(tmp_path), 4)
+    assert reopened.count == 3
+    assert reopened.get(["a", "b", "c"]).tolist() == vectors(1, 2, 3).tolist()
+    assert second.get(["b"]).tolist() == vectors(2).tolist()
+
+
+def test_term_contributions_add_up_to_the_cosine_score():
+    vectorizer = TfidfVectorizer()
+    matrix = vectorizer.fit_transform(RESUMES + [JOB_DESCRIPTION])
+    explanations = explain_tfidf_scores(matrix[:-1], matrix[-1], vectorizer.get_feature_names_out(), top=100)
+    expected = cosine_similarity(matrix[:-1], matrix[-1:]).ravel()
+
+    assert len(explanations) == len(RESUMES)
+    for explanation, score in zip(explanations, expected):
+        assert explanation["score"] == pytest.approx(score)
+        assert sum(contribution for _, contribution in explanation["top_terms"]) == pytest.approx(score)
+        contributions = [contribution for _, contribution in explanation["top_terms"]]
+        assert contributions == sorted(contributions, reverse=True)
+        assert all(contribution > 0 for contribution in contributions)
+
+
+def test_missing_terms_are_the_heaviest_absent_jd_terms():
+    vectorizer = TfidfVectorizer()
+    matrix = vectorizer.fit_transform(RESUMES + [JOB_DESCRIPTION])
+    jd_weights = dict(zip(vectorizer.get_feature_names_out(), matrix[-1].toarray().ravel()))
+    explanation = explain_tfidf_scores(matrix[1:2], matrix[-1], vectorizer.get_feature_names_out(), top=3)[0]
+
+    # Ties keep vocabulary order, which is alphabetical
+    absent = sorted(["python", "developer", "aws", "docker", "kubernetes"], key=lambda term: (-jd_weights[term], term))
+    assert [term for term, _ in explanation["missing_terms"]] == absent[:3]
+    weights = [weight for _, weight in explanation["missing_terms"]]
+    assert weights == sorted(weights, reverse=True)
+    assert [term for term, _ in explanation["top_terms"]] == ["sql"]
+
+
+def test_backend_explain_matches_its_scores():
+    backend = TfidfBackend()
+    scores = backend.score(RESUMES, JOB_DESCRIPTION)
+    explanations = backend.explain(RESUMES, JOB_DESCRIPTION)
+    assert [explanation["score"] for explanation in explanations] == pytest.approx(scores.tolist())
+    assert explanations[0]["top_terms"][0][0] == "python"
+
+
+class WordModel:
+    """Stands in for the sentence model: one dimension per known word."""
+
+    words = ["python", "java", "sql", "aws"]
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, **kwargs):
+        self.encoded.extend(texts)
+        vectors = np.array([[text.split().count(word) + 0.01 for word in self.words] for text in texts],
+                           dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = object.__new__(EmbeddingBackend)
+    backend.model = WordModel()
+    backend.batch_size = 32
+    backend.cache = EmbeddingCache(str(tmp_path / "cache"), len(WordModel.words))
+    return backend
+
+
+def test_stored_index_embeds_only_new_records_and_drops_stale_ones(tmp_path, backend):
+    store = ResumeStore(str(tmp_path / "store"))
+    index = StoredResumeIndex()
+    assert index.search(store, backend, "python") == []
+
+    store.append("a", "python python")
+    store.append("b", "java")
+    assert [text for text, _ in index.search(store, backend, "python", k=2)] == ["python python", "java"]
+
+    backend.model.encoded.clear()
+    store.append("b", "sql sql")
+    store.append("c", "aws")
+    store.delete("a")
+    assert [text for text, _ in index.search(store, backend, "sql", k=5)] == ["sql sql", "aws"]
+    assert backend.model.encoded == ["sql sql", "aws", "sql"]
+
+    # Compaction renumbers rows, so the index starts over from cached embeddings
+    backend.model.encoded.clear()
+    store.compact()
+    assert [text for text, _ in index.search(store, backend, "aws", k=1)] == ["aws"]
+    assert index.rows.tolist() == [0, 1]
+    assert backend.model.encoded == []
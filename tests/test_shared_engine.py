@@ -0,0 +1,140 @@
+import threading
+import time
+
+import pytest
+
+import shared_engine
+from shared_engine import SharedEngine
+
+
+@pytest.fixture
+def engine():
+    engine = SharedEngine(max_workers=2, cache_size=2)
+    yield engine
+    engine.executor.shutdown(wait=True)
+
+
+def run_concurrently(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+@pytest.mark.parametrize("offload", [False, True])
+def test_identical_concurrent_requests_run_once(engine, offload):
+    calls = []
+    results = []
+
+    def slow(value):
+        calls.append(value)
+        time.sleep(0.2)
+        return value * 2
+
+    run_concurrently(8, lambda: results.append(engine.run("n", "k", slow, 21, offload=offload)))
+    assert results == [42] * 8
+    assert calls == [21]
+    assert engine.run("n", "k", slow, 0) == 42
+    assert engine.in_flight == {}
+
+
+def test_none_results_are_not_cached(engine):
+    calls = []
+    engine.run("n", "k", lambda: calls.append(1))
+    engine.run("n", "k", lambda: calls.append(1))
+    assert calls == [1, 1]
+
+
+def test_exceptions_reach_waiters_and_are_not_cached(engine):
+    started = threading.Event()
+    errors = []
+
+    def failing():
+        started.set()
+        time.sleep(0.2)
+        raise ValueError("boom")
+
+    def owner():
+        with pytest.raises(ValueError):
+            engine.run("n", "k", failing)
+
+    def waiter():
+        started.wait()
+        try:
+            engine.run("n", "k", lambda: "unused")
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=owner), threading.Thread(target=waiter)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == ["boom"]
+    assert engine.run("n", "k", lambda: "recovered") == "recovered"
+
+
+def test_control_flow_exceptions_stay_with_the_owner(engine):
+    class Rerun(BaseException):
+        pass
+
+    started = threading.Event()
+    outcomes = {}
+
+    def interrupted():
+        started.set()
+        time.sleep(0.2)
+        raise Rerun()
+
+    def owner():
+        try:
+            engine.run("n", "k", interrupted)
+        except Rerun:
+            outcomes["owner"] = "rerun"
+
+    def waiter():
+        started.wait()
+        outcomes["waiter"] = engine.run("n", "k", lambda: "computed again")
+
+    threads = [threading.Thread(target=owner), threading.Thread(target=waiter)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert outcomes == {"owner": "rerun", "waiter": "computed again"}
+
+
+def test_cache_evicts_least_recently_used(engine):
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        return value
+
+    engine.run("n", "a", compute, "a")
+    engine.run("n", "b", compute, "b")
+    engine.run("n", "a", compute, "a")
+    engine.run("n", "c", compute, "c")
+    assert list(engine.caches["n"]) == ["a", "c"]
+    engine.run("n", "b", compute, "b")
+    assert calls == ["a", "b", "c", "b"]
+
+
+def test_nltk_loads_once_and_only_when_needed(engine, monkeypatch):
+    downloads = []
+    monkeypatch.setattr(shared_engine.nltk, "download", lambda package, quiet: downloads.append(package))
+    monkeypatch.setattr(shared_engine, "stopwords", type("Stub", (), {"words": lambda language: ["the", "a"]}))
+    monkeypatch.setattr(shared_engine, "word_tokenize", str.split)
+    monkeypatch.setattr(shared_engine, "WordNetLemmatizer", lambda: type("Stub", (), {
+        "lemmatize": lambda self, word: word.rstrip("s"),
+    })())
+    engine.job_descriptions = {"Dev": "The pipelines", "Custom": ""}
+
+    assert engine.lemmatizer is None
+    assert downloads == []
+    results = []
+    run_concurrently(8, lambda: results.append(engine.preprocess("the Python pipelines 42")))
+    assert results == ["python pipeline"] * 8
+    assert downloads == shared_engine.NLTK_PACKAGES
+    assert engine.jd_index == {"Dev": "pipeline"}